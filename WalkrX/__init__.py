@@ -1 +1 @@
-from .walkrclient import APIError,WalkrClient
\ No newline at end of file
+from .walkrclient import APIError,Friend,WalkrClient
\ No newline at end of file
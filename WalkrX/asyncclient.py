@@ -0,0 +1,127 @@
+import asyncio
+
+import aiohttp
+
+from .walkrclient import WalkrClient, _json_loads
+
+
+class AsyncWalkrClient(WalkrClient):
+    def __init__(self, auth_token, client_version, platform, timezone=8, locale='en', concurrency=8, **kwargs):
+        """
+        Model of Walkr client on top of aiohttp, every fetch_* and request method returns a coroutine
+        :param auth_token: authorization token
+        :param client_version: client version
+        :param platform: client platform, can be 'android' or 'ios'
+        :param timezone: timezone
+        :param locale: locale
+        :param concurrency: max number of requests in flight for gather_* helpers
+        """
+        super().__init__(auth_token, client_version, platform, timezone, locale, **kwargs)
+        self.concurrency = concurrency
+
+    def __enter__(self):
+        raise TypeError('use "async with" with AsyncWalkrClient')
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        """
+        close the underlying session and release pooled connections, a session passed in is left open
+        """
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def connect(self):
+        """
+        open a connection to the server, run it as a task to overlap the handshake with other setup
+        """
+        try:
+            timeout = aiohttp.ClientTimeout(total=5)
+            async with self._get_session().head(self.base_url, headers=self._request_headers, timeout=timeout):
+                pass
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            pass
+
+    def _create_session(self):
+        # aiohttp sessions have to be created inside a running event loop, see _get_session
+        return None
+
+    def _get_session(self):
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=aiohttp.TCPConnector(limit=32, keepalive_timeout=75)
+            )
+        return self.session
+
+    async def fetch(self, url, payload=None, ttl=0, persist=False):
+        if not ttl:
+            return await self._make_request(url, payload, method='GET')
+        if not persist:
+            key, result = self._cache_lookup(url, payload, ttl)
+            if result is None:
+                result = await self._make_request(url, payload, method='GET')
+                self._cache_set(key, result)
+            return result
+        # the disk tier does blocking file I/O, keep it off the event loop
+        loop = asyncio.get_running_loop()
+        key, result = await loop.run_in_executor(None, self._cache_lookup, url, payload, ttl, True)
+        if result is None:
+            result = await self._make_request(url, payload, method='GET')
+            await loop.run_in_executor(None, self._cache_set, key, result, True)
+        return result
+
+    def _prepare_params(self, payload):
+        # aiohttp rejects bool and None query values, encode them the way requests does
+        params = self._prepare_payload(payload)
+        return {key: str(value) if isinstance(value, bool) else value
+                for key, value in params.items() if value is not None}
+
+    async def _make_request(self, url, payload, method):
+        session = self._get_session()
+        if method == 'GET':
+            response = session.get(url, params=self._prepare_params(payload), headers=self._request_headers)
+        else:
+            response = session.request(method, url, data=self._encode_body(payload), headers=self._request_headers)
+        async with response as result:
+            content = await result.read()
+            if result.status == 200:
+                return _json_loads(content)
+            else:
+                raise self._api_error(method, url, result.status, result, payload, result.request_info.headers)
+
+    async def iter_items(self, url, prefix, payload=None):
+        import ijson
+
+        params = self._prepare_params(payload)
+        async with self._get_session().get(url, params=params, headers=self._request_headers) as result:
+            if result.status != 200:
+                # read the error body so the connection is kept alive for the next request
+                await result.read()
+                raise self._api_error('GET', url, result.status, result, payload, result.request_info.headers)
+            async for item in ijson.items(result.content, prefix, use_float=True):
+                yield item
+
+    async def fetch_friends_slim(self, order_by='population', offset=0, limit=100):
+        return self._slim_friends(await self.fetch_friends(order_by, offset, limit))
+
+    async def gather_check_energy(self, pilot_ids):
+        """
+        harvest energy from several pilots concurrently
+        :param pilot_ids: iterable of pilot ids
+        :return: list of check_energy results, in the order of pilot_ids
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def check(pilot_id):
+            async with semaphore:
+                return await self.check_energy(pilot_id)
+
+        return await asyncio.gather(*[check(pilot_id) for pilot_id in pilot_ids])
+
+    check_energy_all = gather_check_energy
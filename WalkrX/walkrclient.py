@@ -1,13 +1,158 @@
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
 
 BASE_URL = 'https://api.walkrconnect.com/api/v1'
 UA = 'Walkr/4.9.1 (iPhone; iOS 12.1.2; Scale/2.00)'
+CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'walkrx')
+PEDOMETER_SETTINGS_TTL = 30 * 24 * 3600
+
+# only advertise brotli when urllib3 is able to decode it
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+ACCEPT_ENCODING = 'br, gzip, deflate' if brotli is not None else 'gzip, deflate'
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# httpx is only used when the caller passes an httpx.Client, e.g. to get HTTP/2
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+_TRANSPORT_ERRORS = (requests.RequestException,) + ((httpx.HTTPError,) if httpx is not None else ())
+
+if orjson is not None:
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+else:
+    def _json_default(obj):
+        if dataclasses.is_dataclass(obj):
+            return dataclasses.asdict(obj)
+        raise TypeError('Object of type {} is not JSON serializable'.format(type(obj).__name__))
+
+    def _json_dumps(obj):
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=_json_default).encode('utf-8')
+
+    _json_loads = json.loads
+
+_PATHS = {
+    'now': '/now',
+    'shops': '/shops',
+    'epics': '/epics',
+    'games': '/games',
+    'users_friends_count': '/users/friends_count',
+    'fleets_current': '/fleets/current',
+    'fleets_comments': '/fleets/{}/comments',
+    'pilots': '/pilots',
+    'pilots_check': '/pilots/{}/check',
+    'users_friends': '/users/friends',
+    'users_friend_invitations': '/users/friend_invitations',
+    'users_new_friends_count': '/users/new_friends_count',
+    'boosts': '/boosts',
+    'boost': '/boosts/{}',
+    'pilots_convert': '/pilots/convert',
+    'pedometer_settings': '/pedometer_settings',
+    'fleets_check_reward_for_epic': '/fleets/{}/check_reward_for_epic',
+    'fleets_donate': '/fleets/{}/donate',
+    'fleets_invite_list': '/fleets/invite_list',
+    'users_check_friend': '/users/check_friend',
+    'fleets_badges': '/fleets/badges',
+    'fleets': '/fleets',
+    'labs_current': '/labs/current',
+    'labs_comments': '/labs/{}/comments',
+    'labs_donate': '/labs/{}/donate'
+}
+
+
+def _read_disk_cache(path, ttl):
+    # returns the age of the file in seconds along with its content
+    try:
+        age = time.time() - os.path.getmtime(path)
+        if age > ttl:
+            return None
+        with open(path, 'rb') as f:
+            return age, f.read()
+    except OSError:
+        return None
+
+
+def _write_disk_cache(path, content):
+    tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+Friend = namedtuple('Friend', 'id name population')
+
+
+@dataclasses.dataclass
+class _DonatePayload:
+    # donations are sent in bursts, slots keep the per call payload small
+    __slots__ = ('event_status', 'event_type', 'event_id', 'hitpoints', 'energy')
+    event_status: str
+    event_type: str
+    event_id: int
+    hitpoints: int
+    energy: int
+
+
+def _default_field(key):
+    # exposes one of the fields sent with every request as a client attribute, e.g. to refresh the auth token
+    def fget(self):
+        return self._defaults[key]
+
+    def fset(self, value):
+        self._set_defaults({**self._defaults, key: value})
+        # cached responses were fetched with the old value
+        self._cache.clear()
+
+    return property(fget, fset)
+
+
+class _ChunkReader:
+    # file-like view over an iterator of bytes chunks, ijson only needs read()
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+
+    def read(self, size=-1):
+        # ijson probes the stream type with read(0), which must not consume a chunk
+        if size == 0:
+            return b''
+        return next(self._chunks, b'')
 
 
 class APIError(Exception):
-    def __init__(self, status_code):
+    def __init__(self, status_code, response=None):
         super().__init__(self)
         self.status_code = status_code
+        self.response = response
         self.message = 'Request failed with status code {}'.format(status_code)
 
     def __str__(self):
@@ -15,7 +160,8 @@ class APIError(Exception):
 
 
 class WalkrClient:
-    def __init__(self, auth_token, client_version, platform, timezone=8, locale='en', user_agent=UA):
+    def __init__(self, auth_token, client_version, platform, timezone=8, locale='en', user_agent=UA, session=None,
+                 base_url=BASE_URL, cache_dir=CACHE_DIR):
         """
         Model of Walkr client
         :param auth_token: authorization token
@@ -23,50 +169,225 @@ class WalkrClient:
         :param platform: client platform, can be 'android' or 'ios'
         :param timezone: timezone
         :param locale: locale
+        :param session: requests.Session or httpx.Client to send requests with, pass the same one to several
+        clients to share their connection pool, or httpx.Client(http2=True) to multiplex calls over one connection
+        :param base_url: api root to talk to, defaults to BASE_URL
+        :param cache_dir: directory for responses persisted across runs, None disables the disk cache
         """
         self.headers = {
             'Content-Type': 'application/json',
-            'Accept-Encoding': 'br, gzip, deflate',
+            'Accept-Encoding': ACCEPT_ENCODING,
             'User-Agent': user_agent,
             'Connection': 'keep-alive',
-            'Host': 'api.walkrconnect.com'
+            'Host': urlsplit(base_url).netloc
         }
-        self.auth_token = auth_token
-        self.version = client_version
-        self.platform = platform
-        self.tz = timezone
-        self.locale = locale
-        self.session = requests.Session()
-
-    def request(self, url, payload=None):
-        return self._make_request(url, payload, method='POST')
+        self._set_defaults({
+            'auth_token': auth_token,
+            'client_version': client_version,
+            'platform': platform,
+            'timezone': timezone,
+            'locale': locale
+        })
+        self.base_url = base_url
+        self._urls = {name: base_url + path for name, path in _PATHS.items()}
+        # sessions passed in belong to the caller and are never closed by the client
+        self._owns_session = session is None
+        if session is None:
+            self.session = self._create_session()
+            self._request_headers = None
+        else:
+            # a session passed in may be shared with other clients, so our headers are sent per call
+            self.session = session
+            self._request_headers = self.headers
+        self._httpx = httpx is not None and isinstance(self.session, httpx.Client)
+        self.cache_dir = cache_dir
+        self._cache = {}
+
+    auth_token = _default_field('auth_token')
+    version = _default_field('client_version')
+    platform = _default_field('platform')
+    tz = _default_field('timezone')
+    locale = _default_field('locale')
+
+    def _set_defaults(self, defaults):
+        # a new dict is bound rather than mutated, payloads of requests in flight may still reference the old one
+        self._defaults = defaults
+        # POST bodies are built by appending the call specific fields to the pre-encoded defaults
+        self._defaults_body = _json_dumps(defaults)
+        self._defaults_prefix = self._defaults_body[:-1]
+
+    def _create_session(self):
+        session = requests.Session()
+        # headers live on our own session so they are not merged into every request
+        session.headers.update(self.headers)
+        # POST is not retried on purpose, a donation or harvest must not be sent twice
+        retries = Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504], raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=retries)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        close the underlying session and release pooled connections, a session passed in is left open
+        """
+        if self._owns_session:
+            self.session.close()
+
+    def connect(self):
+        """
+        open a connection to the server in the background, so the first api call skips the TLS handshake
+        :return: the started thread
+        """
+        thread = threading.Thread(target=self._warm_up, daemon=True)
+        thread.start()
+        return thread
+
+    def _warm_up(self):
+        try:
+            self.session.head(self.base_url, headers=self._request_headers, timeout=5)
+        except _TRANSPORT_ERRORS:
+            # best effort, the first real call will report any connection error
+            pass
+
+    def request(self, url, payload=None, method='POST'):
+        """
+        base method to send data to server
+        :param url: api url
+        :param payload: data
+        :param method: 'POST' or 'PUT'
+        :return: server json response in a dict
+        :raise APIError:
+        """
+        return self._make_request(url, payload, method=method)
 
-    def fetch(self, url, payload=None):
+    def fetch(self, url, payload=None, ttl=0, persist=False):
         """
         base method to talk to server
         :param url: api url
         :param payload: data
-        :param method:
+        :param ttl: seconds to reuse a cached response for, 0 disables caching
+        :param persist: also keep the cached response on disk under cache_dir
         :return: server json response in a dict
         :raise APIError:
         """
-        return self._make_request(url, payload, method='GET')
+        if not ttl:
+            return self._make_request(url, payload, method='GET')
+        key, result = self._cache_lookup(url, payload, ttl, persist)
+        if result is None:
+            result = self._make_request(url, payload, method='GET')
+            self._cache_set(key, result, persist)
+        return result
 
-    def _make_request(self, url, payload, method):
-        payload['auth_token'] = self.auth_token
-        payload['client_version'] = self.version
-        payload['platform'] = self.platform
-        payload['timezone'] = self.tz
-        payload['locale'] = self.locale
+    def iter_items(self, url, prefix, payload=None):
+        """
+        stream list items out of a GET response without buffering the whole body, requires ijson
+        :param url: api url
+        :param prefix: ijson prefix of the items, e.g. 'friends.item'
+        :param payload: data
+        :return: generator of dicts, APIError is raised on first iteration
+        :raise APIError:
+        """
+        import ijson
 
+        params = self._prepare_payload(payload)
+        if self._httpx:
+            response = self.session.stream('GET', url, params=params, headers=self._request_headers)
+        else:
+            response = self.session.get(url=url, params=params, headers=self._request_headers, stream=True)
+        with response as result:
+            if result.status_code != 200:
+                # read the error body so the connection goes back to the pool instead of being dropped
+                result.read() if self._httpx else result.content
+                raise self._api_error('GET', url, result.status_code, result, payload, result.request.headers)
+            if self._httpx:
+                body = _ChunkReader(result.iter_bytes())
+            else:
+                result.raw.decode_content = True
+                body = result.raw
+            yield from ijson.items(body, prefix, use_float=True)
+
+    def clear_cache(self):
+        """
+        drop all cached responses
+        """
+        self._cache.clear()
+
+    @staticmethod
+    def _cache_key(url, payload):
+        return url, frozenset(payload.items()) if payload else frozenset()
+
+    def _cache_lookup(self, url, payload, ttl, persist=False):
+        # responses are cached encoded, every hit decodes its own copy so callers can't corrupt the cache
+        key = self._cache_key(url, payload)
+        entry = self._cache.get(key)
+        if entry is not None and time.monotonic() - entry[0] < ttl:
+            return key, _json_loads(entry[1])
+        if persist and self.cache_dir is not None:
+            cached = _read_disk_cache(self._disk_cache_path(key), ttl)
+            if cached is not None:
+                age, content = cached
+                try:
+                    result = _json_loads(content)
+                except ValueError:
+                    return key, None
+                # keep the file's age so the entry expires when the file does, not a full ttl later
+                self._cache[key] = (time.monotonic() - age, content)
+                return key, result
+        return key, None
+
+    def _cache_set(self, key, result, persist=False):
+        content = _json_dumps(result)
+        self._cache[key] = (time.monotonic(), content)
+        if persist and self.cache_dir is not None:
+            _write_disk_cache(self._disk_cache_path(key), content)
+
+    def _disk_cache_path(self, key):
+        url, items = key
+        digest = hashlib.sha1(repr((url, sorted(items))).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, digest + '.json')
+
+    def _prepare_payload(self, payload):
+        # never mutate the caller's dict, the defaults are merged into a new one
+        if not payload:
+            return self._defaults
+        return {**self._defaults, **payload}
+
+    def _encode_body(self, payload):
+        if not payload:
+            return self._defaults_body
+        if isinstance(payload, dict) and payload.keys() & self._defaults.keys():
+            # overriding a default would emit a duplicate key, merge like GET does instead
+            return _json_dumps({**self._defaults, **payload})
+        return self._defaults_prefix + b',' + _json_dumps(payload)[1:]
+
+    @staticmethod
+    def _api_error(method, url, status_code, response, payload, headers):
+        # only the call specific payload is logged, the defaults carry the auth token
+        logger.warning('walkr %s %s failed with status code %s', method, url, status_code)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('payload=%.512s headers=%s', payload, dict(headers))
+        return APIError(status_code, response)
+
+    def _make_request(self, url, payload, method):
         if method == 'GET':
-            result = self.session.get(url=url, params=payload, headers=self.headers)
+            result = self.session.get(url=url, params=self._prepare_payload(payload), headers=self._request_headers)
+        elif self._httpx:
+            result = self.session.request(method, url, content=self._encode_body(payload),
+                                          headers=self._request_headers)
         else:
-            result = self.session.request(method=method, url=url, json=payload, headers=self.headers)
+            result = self.session.request(method=method, url=url, data=self._encode_body(payload),
+                                          headers=self._request_headers)
         if result.status_code == 200:
-            return result.json()
+            return _json_loads(result.content)
         else:
-            raise APIError(result.status_code)
+            raise self._api_error(method, url, result.status_code, result, payload, result.request.headers)
 
     def fetch_now(self, system_time):
         """
@@ -74,7 +395,7 @@ class WalkrClient:
         :param system_time: current system timestamp
         :return: dict containing server time
         """
-        url = BASE_URL + '/now'
+        url = self._urls['now']
         payload = {'system_time': system_time}
         return self.fetch(url, payload)
 
@@ -83,16 +404,16 @@ class WalkrClient:
         get items in shop
         :return: dict containing list of items in shop
         """
-        url = BASE_URL + '/shops'
-        return self.fetch(url)
+        url = self._urls['shops']
+        return self.fetch(url, ttl=600)
 
     def fetch_epics(self):
         """
         get list of epics
         :return: dict containing list of epics
         """
-        url = BASE_URL + '/epics'
-        return self.fetch(url)
+        url = self._urls['epics']
+        return self.fetch(url, ttl=1800)
 
     def update_games(self, data):
         """
@@ -100,7 +421,7 @@ class WalkrClient:
         :param data:
         :returns: dict indicating success or not
         """
-        url = BASE_URL + '/games'
+        url = self._urls['games']
         payload = {'data': data}
         return self.request(url, payload)
 
@@ -109,15 +430,15 @@ class WalkrClient:
         get count of friends
         :return: dict with friends count
         """
-        url = BASE_URL + '/users/friends_count'
-        return self.fetch(url)
+        url = self._urls['users_friends_count']
+        return self.fetch(url, ttl=60)
 
     def fetch_current_fleet(self):
         """
         get information about current fleet
         :return: dict containing information about current fleet
         """
-        url = BASE_URL + '/fleets/current'
+        url = self._urls['fleets_current']
         return self.fetch(url)
 
     def fetch_fleet_comments(self, fleet_id, offset=0, limit=30):
@@ -128,7 +449,7 @@ class WalkrClient:
         :param limit: limit, default is 30
         :return: dict containing list of comments
         """
-        url = BASE_URL + '/fleets/{}/comments'.format(fleet_id)
+        url = self._urls['fleets_comments'].format(fleet_id)
         payload = {
             'offset': offset,
             'limit': limit
@@ -140,7 +461,7 @@ class WalkrClient:
         get bridge information
         :return: pilots information in your bridge
         """
-        url = BASE_URL + '/pilots'
+        url = self._urls['pilots']
         return self.fetch(url)
 
     def check_energy(self, pilot_id):
@@ -149,9 +470,21 @@ class WalkrClient:
         :param pilot_id:
         :return: amount of energy checked
         """
-        url = BASE_URL + '/pilots/{}/check'.format(pilot_id)
+        url = self._urls['pilots_check'].format(pilot_id)
         return self.request(url)
 
+    def check_energy_all(self, pilot_ids):
+        """
+        harvest energy from several pilots concurrently, sharing the session's connection pool
+        :param pilot_ids: iterable of pilot ids
+        :return: list of check_energy results, in the order of pilot_ids
+        """
+        pilot_ids = list(pilot_ids)
+        if not pilot_ids:
+            return []
+        with ThreadPoolExecutor(max_workers=min(16, len(pilot_ids))) as executor:
+            return list(executor.map(self.check_energy, pilot_ids))
+
     def fetch_friends(self, order_by='population', offset=0, limit=100):
         """
         get list of friends
@@ -160,7 +493,7 @@ class WalkrClient:
         :param limit:
         :return:
         """
-        url = BASE_URL + '/users/friends'
+        url = self._urls['users_friends']
         payload = {
             'order_by': order_by,
             'offset': offset,
@@ -168,12 +501,42 @@ class WalkrClient:
         }
         return self.fetch(url, payload)
 
+    def iter_friends(self, order_by='population', offset=0, limit=100):
+        """
+        same as fetch_friends, but streams the friends one by one, requires ijson
+        :param order_by:
+        :param offset:
+        :param limit:
+        :return: generator of friend dicts
+        """
+        url = self._urls['users_friends']
+        payload = {
+            'order_by': order_by,
+            'offset': offset,
+            'limit': limit
+        }
+        return self.iter_items(url, 'friends.item', payload)
+
+    def fetch_friends_slim(self, order_by='population', offset=0, limit=100):
+        """
+        same as fetch_friends, but keeps only the id, name and population of each friend
+        :param order_by:
+        :param offset:
+        :param limit:
+        :return: list of Friend namedtuples
+        """
+        return self._slim_friends(self.fetch_friends(order_by, offset, limit))
+
+    @staticmethod
+    def _slim_friends(data):
+        return [Friend(f['id'], f['name'], f['population']) for f in data['friends']]
+
     def fetch_friend_invitations(self):
         """
         get friend invitations
         :return: dict containing list of friend invites
         """
-        url = BASE_URL + '/users/friend_invitations'
+        url = self._urls['users_friend_invitations']
         return self.fetch(url)
 
     def fetch_new_friends_count(self):
@@ -181,7 +544,7 @@ class WalkrClient:
         get count of new friends
         :return: dict containing new friends count
         """
-        url = BASE_URL + '/users/new_friends_count'
+        url = self._urls['users_new_friends_count']
         return self.fetch(url)
 
     def fetch_booster(self):
@@ -189,7 +552,7 @@ class WalkrClient:
         get booster status
         :return: booster status
         """
-        url = BASE_URL + '/boosts'
+        url = self._urls['boosts']
         return self.fetch(url)
 
     def start_booster(self):
@@ -197,7 +560,7 @@ class WalkrClient:
         start booster
         :return: booster status
         """
-        url = BASE_URL + '/boosts'
+        url = self._urls['boosts']
         return self.request(url)
 
     def update_booster_information(self, booster_id, data):
@@ -207,9 +570,9 @@ class WalkrClient:
         :param data:
         :return: success or not
         """
-        url = BASE_URL + '/boosts/{}'.format(booster_id)
+        url = self._urls['boost'].format(booster_id)
         payload = {'data': data}
-        return self._make_request(url, payload, 'PUT')
+        return self.request(url, payload, method='PUT')
 
     def convert_energy(self, converted_energy):
         """
@@ -217,7 +580,7 @@ class WalkrClient:
         :param converted_energy: amount of energy converted
         :return:
         """
-        url = BASE_URL + '/pilots/convert'
+        url = self._urls['pilots_convert']
         payload = {'converted_energy': converted_energy}
         return self.request(url, payload)
 
@@ -229,13 +592,13 @@ class WalkrClient:
         :param os_version: API level for android, iOS version for iOS
         :return: pedometer settings
         """
-        url = BASE_URL + '/pedometer_settings'
+        url = self._urls['pedometer_settings']
         payload = {
             'brand': brand,
             'device_model': device_model,
             'os_version': os_version
         }
-        return self.fetch(url, payload)
+        return self.fetch(url, payload, ttl=PEDOMETER_SETTINGS_TTL, persist=True)
 
     def check_reward_for_epic(self, fleet_id):
         """
@@ -243,7 +606,7 @@ class WalkrClient:
         :param fleet_id:
         :return: epic rewards
         """
-        url = BASE_URL + '/fleets/{}/check_reward_for_epic'.format(fleet_id)
+        url = self._urls['fleets_check_reward_for_epic'].format(fleet_id)
         return self.request(url)
 
     def donate_energy_for_epic(self, fleet_id, hitpoints, event_id, energy):
@@ -255,14 +618,8 @@ class WalkrClient:
         :param energy: amount of energy to donate
         :return: donate amount and hitpoint information
         """
-        url = BASE_URL + '/fleets/{}/donate'.format(fleet_id)
-        payload = {
-            'event_status': 'path',
-            'event_type': 'traveling',
-            'event_id': event_id,
-            'hitpoints': hitpoints,
-            'energy': energy
-        }
+        url = self._urls['fleets_donate'].format(fleet_id)
+        payload = _DonatePayload('path', 'traveling', event_id, hitpoints, energy)
         return self.request(url, payload)
 
     def donate_resources_for_epic(self, fleet_id, hitpoints, event_id, value_a=0, value_b=0, value_c=0):
@@ -276,7 +633,7 @@ class WalkrClient:
         :param value_c: value of resource c
         :return: donate amount and hitpoint information
         """
-        url = BASE_URL + '/fleets/{}/donate'.format(fleet_id)
+        url = self._urls['fleets_donate'].format(fleet_id)
         payload = {
             'event_status': 'event',
             'event_type': 'currency',
@@ -296,7 +653,7 @@ class WalkrClient:
         :param limit:
         :return: dict containing list of friends and invite status
         """
-        url = BASE_URL + '/fleets/invite_list'
+        url = self._urls['fleets_invite_list']
         payload = {
             'epic_id': epic_id,
             'offset': offset,
@@ -310,7 +667,7 @@ class WalkrClient:
         :param user_id:
         :return: is friend or not
         """
-        url = BASE_URL + '/users/check_friend'
+        url = self._urls['users_check_friend']
         payload = {'user_id': user_id}
         return self.fetch(url, payload)
 
@@ -319,8 +676,8 @@ class WalkrClient:
         get list of fleet avatars
         :return: dict containing list of fleet avatars
         """
-        url = BASE_URL + '/fleets/badges'
-        return self.fetch(url)
+        url = self._urls['fleets_badges']
+        return self.fetch(url, ttl=3600)
 
     def fetch_fleet_list(self, epic_id, country_code='US', offset=0, limit=30):
         """
@@ -331,7 +688,7 @@ class WalkrClient:
         :param limit:
         :return: dict containing list of fleets
         """
-        url = BASE_URL + '/fleets'
+        url = self._urls['fleets']
         payload = {
             'epic_id': epic_id,
             'country_code': country_code,
@@ -352,8 +709,8 @@ class WalkrClient:
         :param is_invitable: boolean, if allow invitation of members
         :return: success or not
         """
-        url = BASE_URL + '/fleets'
-        members_string = '0, ' + ', '.join(members)
+        url = self._urls['fleets']
+        members_string = '0,' + ','.join(map(str, members))
         payload = {
             'epic_id': epic_id,
             'members': members_string,
@@ -365,11 +722,11 @@ class WalkrClient:
         return self.request(url, payload)
 
     def get_currently_joined_lab(self):
-        url = BASE_URL + '/labs/current'
+        url = self._urls['labs_current']
         return self.fetch(url, {})
 
     def get_lab_comments(self, lab_id, queried_at, limit=30):
-        url = BASE_URL + '/labs/{id}/comments'.format(id=lab_id)
+        url = self._urls['labs_comments'].format(lab_id)
         payload = {
             'limit': limit,
             'queried_at': queried_at,
@@ -377,7 +734,7 @@ class WalkrClient:
         return self.fetch(url, payload)
 
     def donate_energy_in_lab(self, lab_id, donation, identifier, requirement_id, timestamp, donation_type='energy'):
-        url = BASE_URL + '/labs/{id}/donate'.format(id=lab_id)
+        url = self._urls['labs_donate'].format(lab_id)
         payload = {
             'donation': donation,
             'donation_type': donation_type,
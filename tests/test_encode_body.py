@@ -0,0 +1,82 @@
+import dataclasses
+import importlib.util
+import json
+import sys
+import unittest
+from unittest import mock
+
+from WalkrX import walkrclient
+
+
+def _load_without_orjson():
+    spec = importlib.util.spec_from_file_location('walkrclient_stdlib_json', walkrclient.__file__)
+    module = importlib.util.module_from_spec(spec)
+    with mock.patch.dict(sys.modules, {'orjson': None}):
+        spec.loader.exec_module(module)
+    return module
+
+
+def _loads_unique(body):
+    # fails on duplicate members instead of silently keeping the last one
+    def hook(pairs):
+        keys = [key for key, _ in pairs]
+        assert len(keys) == len(set(keys)), 'duplicate keys in {!r}'.format(body)
+        return dict(pairs)
+
+    return json.loads(body, object_pairs_hook=hook)
+
+
+class EncodeBodyTestMixin:
+    module = None
+
+    def setUp(self):
+        self.client = self.module.WalkrClient('TOKEN', '4.9.1', 'ios', timezone=8, locale='en', cache_dir=None)
+        self.defaults = {
+            'auth_token': 'TOKEN',
+            'client_version': '4.9.1',
+            'platform': 'ios',
+            'timezone': 8,
+            'locale': 'en'
+        }
+
+    def tearDown(self):
+        self.client.close()
+
+    def assertBody(self, payload, expected):
+        self.assertEqual(_loads_unique(self.client._encode_body(payload)), expected)
+
+    def test_no_payload(self):
+        self.assertBody(None, self.defaults)
+        self.assertBody({}, self.defaults)
+
+    def test_dict_payload(self):
+        payload = {'converted_energy': 12, 'data': [1, {'name': 'é'}]}
+        self.assertBody(payload, {**self.defaults, **payload})
+
+    def test_payload_overriding_default(self):
+        payload = {'locale': 'zh', 'limit': 30}
+        self.assertBody(payload, {**self.defaults, **payload})
+
+    def test_donate_payload(self):
+        payload = self.module._DonatePayload('path', 'traveling', 3, 2, 100)
+        self.assertBody(payload, {**self.defaults, **dataclasses.asdict(payload)})
+
+    def test_defaults_follow_attribute_changes(self):
+        self.client.auth_token = 'NEW'
+        self.assertBody({'energy': 1}, {**self.defaults, 'auth_token': 'NEW', 'energy': 1})
+
+
+@unittest.skipIf(walkrclient.orjson is None, 'orjson is not installed')
+class OrjsonEncodeBodyTest(EncodeBodyTestMixin, unittest.TestCase):
+    module = walkrclient
+
+
+class StdlibEncodeBodyTest(EncodeBodyTestMixin, unittest.TestCase):
+    module = _load_without_orjson()
+
+    def test_uses_stdlib_fallback(self):
+        self.assertIsNone(self.module.orjson)
+
+
+if __name__ == '__main__':
+    unittest.main()